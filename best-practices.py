@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import time
-import pytz
+from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor
+import html
 import plotly.graph_objects as go
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 
 # ── Page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -27,63 +29,125 @@ CONCEPT_COLOURS = {
     "Cost of Capital": "#4a90d9",
 }
 
+# CSS class per concept, e.g. "Cost of Debt" → "cat-cost-of-debt"
+CONCEPT_CLASSES = {c: "cat-" + c.lower().replace(" ", "-") for c in CONCEPTS}
+
 # ── Supabase ──────────────────────────────────────────────────────────────────
-@st.cache_resource
+@st.cache_resource(on_release=lambda client: client.options.httpx_client.close())
 def get_supabase() -> Client:
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+    # One bounded keep-alive pool shared by every session, closed if the resource is evicted
+    http = httpx.Client(
+        http2=True, timeout=10, follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"],
+                         options=ClientOptions(httpx_client=http))
+
+@st.cache_resource
+def get_pool() -> ThreadPoolExecutor:
+    """Process-wide workers for overlapping independent Supabase reads (no UI calls inside)."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="supabase")
 
 supabase       = get_supabase()
 TABLE          = "best_practices"
 HISTORY_TABLE  = "edit_history"
 SETTINGS_TABLE = "app_settings"
 CLASSES        = ["GOMBA 2025 S1", "GOMBA 2025 S2"]
+CLASS_PROMPT   = "— select your class —"
+CLASS_OPTIONS  = [CLASS_PROMPT] + CLASSES
 ADMIN_PASSWORD = st.secrets["ADMIN_PASSWORD"]
+CACHE_TTL      = 30  # seconds; our own writes clear the caches, this only bounds outside edits
+# Columns the UI reads (class_name is the filter; rationale is always "" and never shown)
+COLUMNS        = ["id", "category", "practice", "added_by", "added_on",
+                  "last_edited_by", "last_edited_on", "edit_count"]
+STR_COLUMNS    = ["category", "practice", "added_by", "added_on",
+                  "last_edited_by", "last_edited_on"]
+DTYPES         = {"id": "int32", "edit_count": "int32",
+                  **dict.fromkeys(STR_COLUMNS, "string[pyarrow]")}
+HISTORY_COLUMNS = ["category", "practice", "edited_by", "edited_on"]
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
+MADRID_TZ = ZoneInfo("Europe/Madrid")
+
 def now_str() -> str:
-    madrid = pytz.timezone("Europe/Madrid")
-    return datetime.now(madrid).strftime("%Y-%m-%d %H:%M")
+    # Naive local time → isoformat gives "YYYY-MM-DD HH:MM" without strftime's format parsing
+    return datetime.now(MADRID_TZ).replace(tzinfo=None).isoformat(sep=" ", timespec="minutes")
 
 def valid_ie_email(email: str) -> bool:
     return email.strip().lower().endswith("@student.ie.edu")
 
 # ── DB helpers — best_practices ───────────────────────────────────────────────
-def load_data(class_name: str) -> pd.DataFrame:
-    res = (supabase.table(TABLE).select("*")
-           .eq("class_name", class_name).order("id").execute())
-    if not res.data:
-        return pd.DataFrame(columns=[
-            "id", "class_name", "category", "practice", "rationale",
-            "added_by", "added_on", "last_edited_by", "last_edited_on", "edit_count"
-        ])
-    df = pd.DataFrame(res.data)
-    for col in ["last_edited_by", "last_edited_on", "added_by",
-                "category", "practice", "rationale", "class_name"]:
-        df[col] = df[col].fillna("").astype(str)
-    df["edit_count"] = pd.to_numeric(df["edit_count"], errors="coerce").fillna(0).astype(int)
+def _build_frame(rows: list[dict]) -> pd.DataFrame:
+    # Declared schema: no per-column dtype inference, and an empty result has the same shape
+    df = (pd.DataFrame.from_records(rows, columns=COLUMNS)
+          .fillna({**dict.fromkeys(STR_COLUMNS, ""), "edit_count": 0})
+          .astype(DTYPES))
+    # Normalise names once per cache miss so per-rerun checks are plain equality scans
+    for col in ["added_by", "last_edited_by"]:
+        df[col] = df[col].str.strip()
+    # Computed once per cache miss so cards and the summary test a bool, not the editor string
+    df["has_edit"] = (df["last_edited_by"].ne("") & df["last_edited_by"].ne("nan")).astype(bool)
+    # HTML-escaped copies for the cards, built once per cache miss instead of trusting raw input
+    for col in ["practice", "added_by", "last_edited_by"]:
+        df[col + "_h"] = df[col].map(html.escape)
+    # Keep the author's line breaks, which the card's HTML would otherwise collapse
+    df["practice_h"] = df["practice_h"].str.replace("\n", "<br>", regex=False)
     return df
 
-def insert_row(row: dict):
-    supabase.table(TABLE).insert(row).execute()
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False, max_entries=len(CLASSES))
+def _class_frame(class_name: str) -> pd.DataFrame:
+    """Typed, escaped frame for one class. Cached so reruns neither hit Supabase nor
+    rebuild it; cleared on every write."""
+    res = (supabase.table(TABLE).select(",".join(COLUMNS))
+           .eq("class_name", class_name).order("id").execute())
+    return _build_frame(res.data)
 
-def fetch_row(row_id: int) -> dict | None:
-    res = supabase.table(TABLE).select("*").eq("id", row_id).execute()
+def load_data(class_name: str) -> pd.DataFrame:
+    # No class chosen yet ("" before login) has no rows — don't query or take a cache slot
+    return _class_frame(class_name) if class_name in CLASSES else _build_frame([])
+
+def entries_by_concept(df: pd.DataFrame) -> dict:
+    """First entry per concept as a namedtuple, from a single itertuples pass."""
+    entries = {}
+    for r in df.itertuples(index=False):
+        entries.setdefault(r.category, r)
+    return entries
+
+def insert_row(row: dict) -> dict | None:
+    """Insert and return the created row (PostgREST echoes it back), so callers need no re-read."""
+    res = supabase.table(TABLE).insert(row).execute()
+    _class_frame.clear()
     return res.data[0] if res.data else None
 
-def conditional_update_row(row_id: int, expected_practice: str, updates: dict) -> bool:
-    """Update only if practice still matches expected_practice (optimistic lock)."""
+def fetch_row(row_id: int) -> dict | None:
+    """Live copy of the fields the edit flow checks. maybe_single returns None for a missing row."""
+    res = (supabase.table(TABLE).select("id,practice,last_edited_by,edit_count")
+           .eq("id", row_id).maybe_single().execute())
+    return res.data if res else None
+
+def conditional_update_row(row_id: int, expected_count: int, updates: dict) -> bool:
+    """Update only if edit_count is still as read (optimistic lock).
+
+    edit_count is the row's version: every write bumps it, so matching it in the WHERE
+    makes the +1 a compare-and-swap and no row text has to be sent or compared.
+    """
     res = (supabase.table(TABLE)
            .update(updates)
            .eq("id", row_id)
-           .eq("practice", expected_practice)
+           .eq("edit_count", expected_count)
            .execute())
+    # Clear either way: a failed swap means the cached rows are stale (edited or deleted
+    # elsewhere), and the conflict rerun must show the latest version
+    _class_frame.clear()
     return len(res.data) > 0
 
 def delete_row(row_id: int):
     supabase.table(TABLE).delete().eq("id", row_id).execute()
+    _class_frame.clear()
 
 def delete_class_data(class_name: str):
     supabase.table(TABLE).delete().eq("class_name", class_name).execute()
+    _class_frame.clear()
 
 # ── DB helpers — edit_history ─────────────────────────────────────────────────
 def log_history(entry_id: int, class_name: str, category: str,
@@ -98,41 +162,53 @@ def log_history(entry_id: int, class_name: str, category: str,
             "edited_by":  edited_by,
             "edited_on":  edited_on,
         }).execute()
+        _fetch_history.clear()
     except Exception:
         pass
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_history(class_name: str, category: str | None) -> list[dict]:
+    """Revisions filtered server-side; cached per (class, concept) so switching back is instant."""
+    q = (supabase.table(HISTORY_TABLE).select(",".join(HISTORY_COLUMNS))
+         .eq("class_name", class_name)
+         .order("id", desc=True))
+    if category:
+        q = q.eq("category", category)
+    return q.execute().data
+
 def load_history(class_name: str, category: str | None = None) -> pd.DataFrame:
     """Load revision history. Returns empty DataFrame on any error."""
     try:
-        q = (supabase.table(HISTORY_TABLE).select("*")
-             .eq("class_name", class_name)
-             .order("id", desc=True))
-        if category:
-            q = q.eq("category", category)
-        res = q.execute()
-        if not res.data:
-            return pd.DataFrame(columns=[
-                "id", "entry_id", "class_name", "category",
-                "practice", "edited_by", "edited_on"
-            ])
-        return pd.DataFrame(res.data)
+        rows = _fetch_history(class_name, category)
+        if not rows:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        hist = pd.DataFrame(rows)
+        # Escaped per frame rather than per card; raw columns stay for the table view
+        for col in ["practice", "edited_by"]:
+            hist[col + "_h"] = hist[col].fillna("").map(html.escape)
+        hist["practice_h"] = hist["practice_h"].str.replace("\n", "<br>", regex=False)
+        return hist
     except Exception:
-        return pd.DataFrame(columns=[
-            "id", "entry_id", "class_name", "category",
-            "practice", "edited_by", "edited_on"
-        ])
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
 
 # ── DB helpers — app_settings ───────────────────────────────────────────────
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _fetch_setting(key: str) -> str | None:
+    """Raw setting value, cached like the row reads; errors propagate so they aren't cached."""
+    res = supabase.table(SETTINGS_TABLE).select("value").eq("key", key).execute()
+    return res.data[0]["value"] if res.data else None
+
 def get_setting(key: str, default: str = "false") -> str:
     try:
-        res = supabase.table(SETTINGS_TABLE).select("value").eq("key", key).execute()
-        return res.data[0]["value"] if res.data else default
+        value = _fetch_setting(key)
     except Exception:
         return default
+    return default if value is None else value
 
 def set_setting(key: str, value: str):
     try:
         supabase.table(SETTINGS_TABLE).upsert({"key": key, "value": value}).execute()
+        _fetch_setting.clear()
     except Exception:
         pass
 
@@ -140,33 +216,113 @@ def set_setting(key: str, value: str):
 def contribution_summary(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame()
-    added  = df.groupby("added_by").size().reset_index(name="Entries Added")
-    mask   = ~df["last_edited_by"].astype(str).str.strip().isin(["", "nan"])
-    edited = df[mask].groupby("last_edited_by").size().reset_index(name="Entries Edited")
-    merged = added.merge(edited, left_on="added_by", right_on="last_edited_by", how="outer")
-    merged["Student"] = merged["added_by"].fillna(merged["last_edited_by"])
-    merged = merged[["Student", "Entries Added", "Entries Edited"]].fillna(0)
-    merged["Entries Added"]       = merged["Entries Added"].astype(int)
-    merged["Entries Edited"]      = merged["Entries Edited"].astype(int)
-    merged["Total Contributions"] = merged["Entries Added"] + merged["Entries Edited"]
-    merged = merged.sort_values("Total Contributions", ascending=False).reset_index(drop=True)
-    merged.index += 1
-    return merged
+    added  = df.groupby("added_by", sort=False).size().rename("Entries Added")
+    edited = df.loc[df["has_edit"]].groupby("last_edited_by", sort=False).size().rename("Entries Edited")
+    # Align the two tallies on the student index — no hash join; missing sides become 0
+    counts = pd.concat([added, edited], axis=1).fillna(0).astype("int32")
+    # Column add stays int32 (a row-wise sum would upcast to int64)
+    counts["Total Contributions"] = counts["Entries Added"] + counts["Entries Edited"]
+    counts = (counts.rename_axis("Student")
+              .sort_values("Total Contributions", ascending=False, kind="stable")
+              .reset_index())
+    counts.index += 1
+    return counts
+
+def frame_fingerprint(df: pd.DataFrame) -> tuple:
+    """Cheap stand-in for hashing the frame: changes on any add, edit or delete."""
+    if df.empty:
+        return (0, 0, 0)
+    # Plain NumPy reductions on the int32 columns, skipping pandas' Series reduction overhead
+    return (len(df), int(df["edit_count"].to_numpy().sum()), int(df["id"].to_numpy().max()))
+
+# One slot per class plus the no-class ("" before login) view, so they don't evict each other
+@st.cache_data(show_spinner=False, max_entries=len(CLASSES) + 1)
+def cached_contribution_summary(class_name: str, fingerprint: tuple,
+                                _df: pd.DataFrame) -> pd.DataFrame:
+    """contribution_summary() keyed on (class, fingerprint); _df is not hashed by Streamlit."""
+    return contribution_summary(_df)
+
+@st.cache_data(show_spinner=False, max_entries=len(CLASSES) + 1)  # as the summary cache
+def build_contrib_fig(students: tuple, added: tuple, edited: tuple) -> go.Figure:
+    """Stacked added/edited bar chart, cached on plain tuples so unchanged data reuses it."""
+    fig = go.Figure()
+    fig.add_bar(name="Added",  x=students, y=added,  marker_color="#1a2e4a")
+    fig.add_bar(name="Edited", x=students, y=edited, marker_color="#c8952a")
+    max_val = sum(added) + sum(edited)
+    fig.update_layout(
+        barmode="stack", plot_bgcolor="white",
+        yaxis=dict(title="Contributions", tickmode="linear",
+                   tick0=0, dtick=1, range=[0, max(max_val, 1) + 0.5]),
+        xaxis_title="Student", legend_title="Type",
+        margin=dict(t=20, b=20),
+    )
+    return fig
+
+HTML_CHART_MAX_STUDENTS = 50  # above this, fall back to the Plotly chart
+
+def contrib_bars_html(contrib: pd.DataFrame) -> str:
+    """Stacked added/edited bars as plain HTML/CSS — no Plotly JSON or JS for a class-sized table."""
+    top  = max(int(contrib["Total Contributions"].max()), 1)
+    rows = "".join(
+        f'<div class="bar-row"><span class="bar-label">{html.escape(student)}</span>'
+        f'<div class="bar-track">'
+        f'<div class="bar-added" style="width:{added / top * 100:.1f}%"></div>'
+        f'<div class="bar-edited" style="width:{edited / top * 100:.1f}%"></div>'
+        f'</div><span class="bar-total">{added + edited}</span></div>'
+        for student, added, edited in zip(contrib["Student"], contrib["Entries Added"],
+                                          contrib["Entries Edited"])
+    )
+    legend = ('<div class="bar-legend"><span class="bar-key bar-added"></span>Added'
+              '<span class="bar-key bar-edited"></span>Edited</div>')
+    return legend + rows
+
+# ── Card markup ───────────────────────────────────────────────────────────────
+def card_html(row, show_count: bool = True) -> str:
+    """Entry card from a load_data namedtuple; text fields come pre-escaped (the _h columns)."""
+    edited_line = ""
+    if row.has_edit:
+        count = f' (edit #{int(row.edit_count)})' if show_count else ""
+        edited_line = (
+            f'<span>✏️ Last edited by <strong>{row.last_edited_by_h}</strong>'
+            f' on {row.last_edited_on}{count}</span>'
+        )
+    return (
+        f'<div class="bp-card {CONCEPT_CLASSES.get(row.category, "")}">'
+        f'<div class="bp-practice">{row.practice_h}</div>'
+        f'<div class="bp-meta">'
+        f'<span>➕ Added by <strong>{row.added_by_h}</strong> on {row.added_on}</span>'
+        f'{edited_line}'
+        f'</div>'
+        f'</div>'
+    )
 
 # ── Session state ─────────────────────────────────────────────────────────────
-if "student_name"        not in st.session_state: st.session_state.student_name        = ""
-if "student_email"       not in st.session_state: st.session_state.student_email       = ""
-if "student_class"       not in st.session_state: st.session_state.student_class       = ""
-if "editing_id"          not in st.session_state: st.session_state.editing_id          = None
-if "adding_concept"      not in st.session_state: st.session_state.adding_concept      = None
-if "submitting"          not in st.session_state: st.session_state.submitting          = False
-if "confirm_delete"      not in st.session_state: st.session_state.confirm_delete      = None
-if "confirm_reset"       not in st.session_state: st.session_state.confirm_reset       = None
-if "admin_authenticated" not in st.session_state: st.session_state.admin_authenticated = False
-if "conflict_warning"    not in st.session_state: st.session_state["conflict_warning"] = None
+SESSION_DEFAULTS = {
+    "student_name":        "",
+    "student_email":       "",
+    "student_class":       "",
+    "editing_id":          None,
+    "adding_concept":      None,
+    "submitting":          False,
+    "confirm_delete":      None,
+    "confirm_reset":       None,
+    "admin_authenticated": False,
+    "conflict_warning":    None,
+    "flash":               None,
+}
+for key, default in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, default)
 
 # ── CSS ───────────────────────────────────────────────────────────────────────
-st.markdown("""
+# Per-concept colour rules, so cards only carry a class name instead of an inline style
+CONCEPT_CSS = "\n".join(
+    f"    .bp-card.{CONCEPT_CLASSES[c]}       {{ border-left-color:{CONCEPT_COLOURS[c]}; }}\n"
+    f"    .concept-bar.{CONCEPT_CLASSES[c]}   {{ background:{CONCEPT_COLOURS[c]}; }}\n"
+    f"    .concept-label.{CONCEPT_CLASSES[c]} {{ color:{CONCEPT_COLOURS[c]}; }}"
+    for c in CONCEPTS
+)
+
+CSS = """
 <style>
     :root { --navy:#1a2e4a; --gold:#c8952a; --light:#f4f6f9;
             --card:#ffffff; --border:#dde3ec; --muted:#6b7a99; }
@@ -188,12 +344,28 @@ st.markdown("""
         border-left:4px solid var(--gold); padding-left:.7rem; margin:1.4rem 0 .8rem; }
 
     .bp-card { background:var(--card); border:1px solid var(--border);
-        border-radius:8px; padding:1rem 1.2rem; margin-bottom:.3rem;
+        border-left:5px solid #4a90d9; border-radius:8px; padding:1rem 1.2rem; margin-bottom:.3rem;
         box-shadow:0 1px 4px rgba(0,0,0,.05); }
     .bp-card:hover { box-shadow:0 3px 10px rgba(0,0,0,.09); }
     .bp-practice { font-size:1rem; color:#222; line-height:1.6; margin-bottom:.55rem; }
     .bp-meta     { font-size:.76rem; color:var(--muted); }
     .bp-meta span { margin-right:.9rem; }
+
+    .concept-bar { color:white; font-weight:700; font-size:.85rem; letter-spacing:.6px;
+        text-transform:uppercase; padding:.45rem .9rem; border-radius:6px; margin:1.1rem 0 .5rem; }
+    .concept-bar.spaced { margin:1.4rem 0 .6rem; }
+    .concept-label { font-weight:700; }
+
+    .bar-legend { font-size:.8rem; color:var(--muted); margin-bottom:.5rem; }
+    .bar-key    { display:inline-block; width:10px; height:10px; border-radius:2px;
+        margin:0 .3rem 0 .9rem; }
+    .bar-row    { display:flex; align-items:center; margin:.3rem 0; font-size:.85rem; }
+    .bar-label  { flex:0 0 11rem; color:var(--navy); overflow:hidden;
+        text-overflow:ellipsis; white-space:nowrap; }
+    .bar-track  { flex:1; display:flex; height:1.1rem; }
+    .bar-added  { background:#1a2e4a; }
+    .bar-edited { background:#c8952a; }
+    .bar-total  { margin-left:.6rem; color:var(--muted); font-weight:600; }
     .stButton > button { border-radius:6px !important; font-weight:600 !important; }
 
     [data-testid="stSidebar"] [data-baseweb="select"] div,
@@ -201,8 +373,11 @@ st.markdown("""
     [data-testid="stSidebar"] [data-baseweb="select"] input { color:white !important; }
     [data-testid="stSidebar"] [data-baseweb="select"] > div
         { background-color:#253d5e !important; border-color:#3a5278 !important; }
+""" + CONCEPT_CSS + """
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # SIDEBAR
@@ -211,30 +386,32 @@ IE_DOMAIN = "@student.ie.edu"
 
 with st.sidebar:
     st.markdown("## 👤 Your Identity")
-    name_input  = st.text_input("Full name",
-                                value=st.session_state.student_name,
-                                placeholder="e.g. Jane Smith")
-    # Store only the username part; append the domain internally
-    stored_username = st.session_state.student_email.replace(IE_DOMAIN, "") \
-                      if st.session_state.student_email.endswith(IE_DOMAIN) \
-                      else st.session_state.student_email
-    username_input = st.text_input(
-        "IE email username",
-        value=stored_username,
-        placeholder="e.g. jsmith")
-    st.caption("Enter the part before @student.ie.edu")
+    # A form batches the three fields into one rerun instead of one per edited field
+    with st.form("identity_form", border=False):
+        name_input  = st.text_input("Full name",
+                                    value=st.session_state.student_name,
+                                    placeholder="e.g. Jane Smith")
+        # Store only the username part; append the domain internally
+        stored_username = st.session_state.student_email.replace(IE_DOMAIN, "") \
+                          if st.session_state.student_email.endswith(IE_DOMAIN) \
+                          else st.session_state.student_email
+        username_input = st.text_input(
+            "IE email username",
+            value=stored_username,
+            placeholder="e.g. jsmith")
+        st.caption("Enter the part before @student.ie.edu")
+        class_input   = st.selectbox(
+            "Your class", CLASS_OPTIONS,
+            index=CLASS_OPTIONS.index(st.session_state.student_class)
+            if st.session_state.student_class in CLASS_OPTIONS else 0
+        )
+        st.form_submit_button("Continue")
     email_input = (username_input.strip().lower() + IE_DOMAIN) if username_input.strip() else ""
-    class_options = ["— select your class —"] + CLASSES
-    class_input   = st.selectbox(
-        "Your class", class_options,
-        index=class_options.index(st.session_state.student_class)
-        if st.session_state.student_class in class_options else 0
-    )
     if name_input:
         st.session_state.student_name  = name_input.strip()
     if email_input:
         st.session_state.student_email = email_input
-    if class_input != "— select your class —":
+    if class_input != CLASS_PROMPT:
         st.session_state.student_class = class_input
 
     logged_in = (
@@ -256,11 +433,11 @@ with st.sidebar:
                 "students can contribute to and edit.")
     st.markdown("---")
     st.markdown("### 🏷️ Concept")
-    for concept, colour in CONCEPT_COLOURS.items():
-        st.markdown(
-            f"<span style='display:inline-block;width:10px;height:10px;"
-            f"background:{colour};border-radius:50%;margin-right:6px;'></span>{concept}",
-            unsafe_allow_html=True)
+    st.markdown("".join(
+        f"<div><span style='display:inline-block;width:10px;height:10px;"
+        f"background:{colour};border-radius:50%;margin-right:6px;'></span>{concept}</div>"
+        for concept, colour in CONCEPT_COLOURS.items()
+    ), unsafe_allow_html=True)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # HEADER & METRICS
@@ -274,14 +451,20 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
-df = load_data(active_class)
+# An admin resetting another class needs its rows too: warm that cache entry alongside
+admin_class         = st.session_state.get("admin_class_select", active_class)
+admin_future        = (get_pool().submit(_class_frame, admin_class)
+                       if st.session_state.admin_authenticated and admin_class != active_class
+                       else None)
+df                  = load_data(active_class)
 cross_class_enabled = get_setting("cross_class_enabled") == "true"
 
 c1, c2, c3 = st.columns(3)
-c1.metric("📝 Concepts covered",
-          f"{df['category'].nunique()} / {len(CONCEPTS)}" if not df.empty else f"0 / {len(CONCEPTS)}")
-c2.metric("🎓 Contributors",  df["added_by"].nunique() if not df.empty else 0)
-c3.metric("✏️ Total Edits",   int(df["edit_count"].sum()) if not df.empty else 0)
+# One agg call over the typed frame (all zeros when empty) instead of three separate scans
+stats = df.agg({"category": "nunique", "added_by": "nunique", "edit_count": "sum"})
+c1.metric("📝 Concepts covered", f"{int(stats['category'])} / {len(CONCEPTS)}")
+c2.metric("🎓 Contributors",      int(stats["added_by"]))
+c3.metric("✏️ Total Edits",       int(stats["edit_count"]))
 st.markdown("---")
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -302,33 +485,40 @@ tab_compare = _tabs[3] if cross_class_enabled else None
 # TAB 1 — BEST PRACTICES LIST
 # ─────────────────────────────────────────────────────────────────────────────
 with tab1:
-    concept_map = {}
-    for concept in CONCEPTS:
-        rows = df[df["category"] == concept] if not df.empty else pd.DataFrame()
-        concept_map[concept] = rows.iloc[0] if not rows.empty else None
+    if st.session_state.flash:
+        st.toast(st.session_state.flash)
+        st.session_state.flash = None
 
-    for concept in CONCEPTS:
-        colour = CONCEPT_COLOURS[concept]
-        row    = concept_map[concept]
+    # First entry per concept as plain namedtuples — one itertuples pass, no per-row Series
+    concept_map = entries_by_concept(df)
 
-        # Concept heading bar
-        st.markdown(
-            f'<div style="background:{colour};color:white;font-weight:700;'
-            f'font-size:.85rem;letter-spacing:.6px;text-transform:uppercase;'
-            f'padding:.45rem .9rem;border-radius:6px;margin:1.1rem 0 .5rem;">'
-            f'{concept}</div>',
-            unsafe_allow_html=True,
-        )
+    # Resolved once; None means an anonymous viewer, who gets no edit/delete widgets at all
+    current_student = st.session_state.student_name if logged_in else None
+    # Read once per rerun — writes below still go through st.session_state and a rerun
+    adding_concept  = st.session_state.adding_concept
+    editing_id      = st.session_state.editing_id
+    confirm_delete  = st.session_state.confirm_delete
+
+    for concept in CONCEPTS:
+        row    = concept_map.get(concept)
+
+        # Heading bar plus the static body (card or empty notice) go out as one element;
+        # only the widgets below need their own
+        block = f'<div class="concept-bar {CONCEPT_CLASSES[concept]}">{concept}</div>'
+        if row is not None:
+            block += card_html(row)
+        elif current_student is None:
+            block += ('<p style="color:#6b7a99;font-size:.88rem;margin:.2rem 0 .8rem .3rem;">'
+                      'No entry yet. Log in to be the first to add one.</p>')
+        elif adding_concept != concept:
+            block += ('<p style="color:#6b7a99;font-size:.88rem;margin:.2rem 0 .4rem .3rem;">'
+                      'No entry yet — be the first to add one!</p>')
+        st.html(block)
+        if current_student is None:
+            continue  # anonymous viewers get no add/edit/delete widgets
 
         if row is None:
-            # No entry yet
-            if not logged_in:
-                st.markdown(
-                    '<p style="color:#6b7a99;font-size:.88rem;margin:.2rem 0 .8rem .3rem;">'
-                    'No entry yet. Log in to be the first to add one.</p>',
-                    unsafe_allow_html=True,
-                )
-            elif st.session_state.adding_concept == concept:
+            if adding_concept == concept:
                 with st.form(key=f"add_form_{concept}"):
                     new_content  = st.text_area(
                         "Best Practice",
@@ -350,186 +540,156 @@ with tab1:
                         else:
                             st.session_state.submitting = True
                             ts = now_str()
-                            insert_row({
+                            new_row = insert_row({
                                 "class_name":     active_class,
                                 "category":       concept,
                                 "practice":       new_content.strip(),
                                 "rationale":      "",
-                                "added_by":       st.session_state.student_name,
+                                "added_by":       current_student,
                                 "added_on":       ts,
                                 "last_edited_by": "",
                                 "last_edited_on": "",
                                 "edit_count":     0,
                             })
-                            # Fetch new row id for history log
-                            new_row = (supabase.table(TABLE).select("id")
-                                       .eq("class_name", active_class)
-                                       .eq("category", concept)
-                                       .execute())
-                            if new_row.data:
+                            if new_row:
                                 log_history(
-                                    entry_id   = new_row.data[0]["id"],
+                                    entry_id   = new_row["id"],
                                     class_name = active_class,
                                     category   = concept,
                                     practice   = new_content.strip(),
-                                    edited_by  = st.session_state.student_name,
+                                    edited_by  = current_student,
                                     edited_on  = ts,
                                 )
                             st.session_state.adding_concept = None
                             st.session_state.submitting     = False
-                            st.success(f"✅ Best practice added! Thank you, {st.session_state.student_name}.")
-                            time.sleep(2.5)
+                            # Shown as a toast on the next run instead of sleeping before the rerun
+                            st.session_state.flash = f"✅ Best practice added! Thank you, {current_student}."
                             st.rerun()
                     if add_cancelled:
                         st.session_state.adding_concept = None
                         st.rerun()
             else:
-                st.markdown(
-                    '<p style="color:#6b7a99;font-size:.88rem;margin:.2rem 0 .4rem .3rem;">'
-                    'No entry yet — be the first to add one!</p>',
-                    unsafe_allow_html=True,
-                )
                 if st.button("➕ Add best practice", key=f"add_btn_{concept}"):
                     st.session_state.adding_concept = concept
                     st.rerun()
 
         else:
-            # Entry exists — show card
-            edited_line = ""
-            if str(row.get("last_edited_by", "")).strip() not in ("", "nan"):
-                edited_line = (
-                    f'<span>✏️ Last edited by <strong>{row["last_edited_by"]}</strong>'
-                    f' on {row["last_edited_on"]} (edit #{int(row["edit_count"])})</span>'
+            row_id_int = int(row.id)
+            is_author  = row.added_by == current_student
+            editing    = editing_id == row_id_int
+
+            # Conflict warning — rendered at card level so it survives the rerun
+            # that follows a blocked save (editing_id is already None by then)
+            if st.session_state.get("conflict_warning") == row_id_int:
+                editor  = st.session_state.pop("conflict_editor", None) or "a classmate"
+                st.warning(
+                    f"⚠️ This entry was edited by **{editor}** while you had the "
+                    f"form open. The latest version is shown above — please "
+                    f"re-open the form if you still want to make changes."
                 )
-            st.markdown(
-                f'<div class="bp-card" style="border-left:5px solid {colour};">'
-                f'<div class="bp-practice">{row["practice"]}</div>'
-                f'<div class="bp-meta">'
-                f'<span>➕ Added by <strong>{row["added_by"]}</strong> on {row["added_on"]}</span>'
-                f'{edited_line}'
-                f'</div>'
-                f'</div>',
-                unsafe_allow_html=True,
-            )
-
-            if logged_in:
-                is_author  = st.session_state.student_name == row["added_by"]
-                editing    = st.session_state.editing_id == int(row["id"])
-                row_id_int = int(row["id"])
-
-                # Conflict warning — rendered at card level so it survives the rerun
-                # that follows a blocked save (editing_id is already None by then)
-                if st.session_state.get("conflict_warning") == row_id_int:
-                    live_w  = fetch_row(row_id_int)
-                    editor  = (live_w.get("last_edited_by") or "a classmate") if live_w else "a classmate"
-                    st.warning(
-                        f"⚠️ This entry was edited by **{editor}** while you had the "
-                        f"form open. The latest version is shown above — please "
-                        f"re-open the form if you still want to make changes."
-                    )
-                    st.session_state["conflict_warning"] = None
-
-                if editing:
-                    snap_key = "orig_text"
-                    snap_for = "orig_for_id"
-                    # Snapshot set once per form open (identified by row id)
-                    if st.session_state.get(snap_for) != row_id_int:
-                        live_now = fetch_row(row_id_int)
-                        st.session_state[snap_key] = live_now["practice"] if live_now else row["practice"]
-                        st.session_state[snap_for] = row_id_int
-                    original_text = st.session_state[snap_key]
-
-                    with st.form(key=f"edit_form_{row['id']}"):
-                        new_content  = st.text_area("Best Practice",
-                                                    value=original_text, height=200)
-                        ecol1, ecol2 = st.columns(2)
-                        with ecol1:
-                            save_btn = st.form_submit_button("💾 Save Changes", type="primary")
-                        with ecol2:
-                            cancel_btn = st.form_submit_button("Cancel")
-
-                        if save_btn:
-                            if not new_content.strip():
-                                st.error("The Best Practice field cannot be empty.")
-                            elif new_content.strip() == original_text.strip():
-                                st.session_state.editing_id = None
-                                st.session_state.pop(snap_key, None)
-                                st.session_state.pop(snap_for, None)
-                                st.info("No changes were made.")
-                                st.rerun()
+                st.session_state["conflict_warning"] = None
+
+            if editing:
+                snap_key   = "orig_text"
+                snap_count = "orig_count"
+                snap_for   = "orig_for_id"
+                # Snapshot set once per form open (identified by row id); the
+                # edit_count read here is the version the save will compare against
+                if st.session_state.get(snap_for) != row_id_int:
+                    live_now = fetch_row(row_id_int) or row._asdict()
+                    st.session_state[snap_key]   = live_now["practice"]
+                    st.session_state[snap_count] = int(live_now["edit_count"])
+                    st.session_state[snap_for]   = row_id_int
+                original_text  = st.session_state[snap_key]
+                original_count = st.session_state[snap_count]
+
+                with st.form(key=f"edit_form_{row.id}"):
+                    new_content  = st.text_area("Best Practice",
+                                                value=original_text, height=200)
+                    ecol1, ecol2 = st.columns(2)
+                    with ecol1:
+                        save_btn = st.form_submit_button("💾 Save Changes", type="primary")
+                    with ecol2:
+                        cancel_btn = st.form_submit_button("Cancel")
+
+                    if save_btn:
+                        if not new_content.strip():
+                            st.error("The Best Practice field cannot be empty.")
+                        elif new_content.strip() == original_text.strip():
+                            st.session_state.editing_id = None
+                            for k in (snap_key, snap_count, snap_for):
+                                st.session_state.pop(k, None)
+                            st.info("No changes were made.")
+                            st.rerun()
+                        else:
+                            # One round trip: the WHERE on edit_count is the conflict
+                            # check, and an empty result means it failed
+                            ts    = now_str()
+                            saved = conditional_update_row(
+                                row_id_int,
+                                original_count,
+                                {
+                                    "practice":       new_content.strip(),
+                                    "last_edited_by": current_student,
+                                    "last_edited_on": ts,
+                                    "edit_count":     original_count + 1,
+                                }
+                            )
+                            if saved:
+                                log_history(
+                                    entry_id   = row_id_int,
+                                    class_name = active_class,
+                                    category   = row.category,
+                                    practice   = new_content.strip(),
+                                    edited_by  = current_student,
+                                    edited_on  = ts,
+                                )
                             else:
+                                # Only now re-read, to tell a deletion from a concurrent edit
                                 live = fetch_row(row_id_int)
                                 if live is None:
                                     st.error("This entry no longer exists — it may have been deleted.")
-                                    st.session_state.editing_id = None
-                                    st.session_state.pop(snap_key, None)
-                                    st.session_state.pop(snap_for, None)
-                                    st.rerun()
                                 else:
-                                    ts    = now_str()
-                                    saved = conditional_update_row(
-                                        row_id_int,
-                                        original_text.strip(),
-                                        {
-                                            "practice":       new_content.strip(),
-                                            "last_edited_by": st.session_state.student_name,
-                                            "last_edited_on": ts,
-                                            "edit_count":     int(live["edit_count"]) + 1,
-                                        }
-                                    )
-                                    if saved:
-                                        log_history(
-                                            entry_id   = row_id_int,
-                                            class_name = active_class,
-                                            category   = row["category"],
-                                            practice   = new_content.strip(),
-                                            edited_by  = st.session_state.student_name,
-                                            edited_on  = ts,
-                                        )
-                                        st.session_state.editing_id = None
-                                        st.session_state.pop(snap_key, None)
-                                        st.session_state.pop(snap_for, None)
-                                        st.rerun()
-                                    else:
-                                        # Concurrent edit detected — flag for warning outside form
-                                        st.session_state["conflict_warning"] = row_id_int
-                                        st.session_state.editing_id = None
-                                        st.session_state.pop(snap_key, None)
-                                        st.session_state.pop(snap_for, None)
-                                        st.rerun()
-                        if cancel_btn:
+                                    # Flag for the card-level warning shown after the rerun
+                                    st.session_state["conflict_warning"] = row_id_int
+                                    st.session_state["conflict_editor"]  = live["last_edited_by"]
                             st.session_state.editing_id = None
-                            st.session_state.pop(snap_key, None)
-                            st.session_state.pop(snap_for, None)
+                            for k in (snap_key, snap_count, snap_for):
+                                st.session_state.pop(k, None)
                             st.rerun()
+                    if cancel_btn:
+                        st.session_state.editing_id = None
+                        for k in (snap_key, snap_count, snap_for):
+                            st.session_state.pop(k, None)
+                        st.rerun()
 
-                elif is_author:
-                    if st.session_state.confirm_delete == row_id_int:
-                        st.warning("Are you sure you want to delete this entry? This cannot be undone.")
-                        dcol1, dcol2 = st.columns(2)
-                        with dcol1:
-                            if st.button("🗑️ Yes, delete it", key=f"del_confirm_{row['id']}"):
-                                delete_row(row_id_int)
-                                st.session_state.confirm_delete = None
-                                st.rerun()
-                        with dcol2:
-                            if st.button("Cancel", key=f"del_cancel_{row['id']}"):
-                                st.session_state.confirm_delete = None
-                                st.rerun()
-                    else:
-                        acol1, acol2 = st.columns(2)
-                        with acol1:
-                            if st.button("✏️ Edit my entry", key=f"author_edit_btn_{row['id']}"):
-                                st.session_state.editing_id = row_id_int
-                                st.rerun()
-                        with acol2:
-                            if st.button("🗑️ Delete my entry", key=f"del_btn_{row['id']}"):
-                                st.session_state.confirm_delete = row_id_int
-                                st.rerun()
+            elif is_author:
+                if confirm_delete == row_id_int:
+                    st.warning("Are you sure you want to delete this entry? This cannot be undone.")
+                    dcol1, dcol2 = st.columns(2)
+                    with dcol1:
+                        if st.button("🗑️ Yes, delete it", key=f"del_confirm_{row.id}"):
+                            delete_row(row_id_int)
+                            st.session_state.confirm_delete = None
+                            st.rerun()
+                    with dcol2:
+                        if st.button("Cancel", key=f"del_cancel_{row.id}"):
+                            st.session_state.confirm_delete = None
+                            st.rerun()
                 else:
-                    if st.button("✏️ Edit this entry", key=f"other_edit_btn_{row['id']}"):
-                        st.session_state.editing_id = row_id_int
-                        st.rerun()
+                    acol1, acol2 = st.columns(2)
+                    with acol1:
+                        if st.button("✏️ Edit my entry", key=f"author_edit_btn_{row.id}"):
+                            st.session_state.editing_id = row_id_int
+                            st.rerun()
+                    with acol2:
+                        if st.button("🗑️ Delete my entry", key=f"del_btn_{row.id}"):
+                            st.session_state.confirm_delete = row_id_int
+                            st.rerun()
+            else:
+                if st.button("✏️ Edit this entry", key=f"other_edit_btn_{row.id}"):
+                    st.session_state.editing_id = row_id_int
+                    st.rerun()
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TAB 2 — CONTRIBUTIONS
@@ -540,7 +700,7 @@ with tab2:
     st.markdown("The table below tallies each student's contributions: how many best "
                 "practices they **added** and how many existing entries they **edited**.")
 
-    contrib = contribution_summary(df)
+    contrib = cached_contribution_summary(active_class, frame_fingerprint(df), df)
     if contrib.empty:
         st.info("No contributions recorded yet.")
     else:
@@ -554,21 +714,13 @@ with tab2:
 
         st.markdown("<div class='section-title'>Contribution Chart</div>",
                     unsafe_allow_html=True)
-        chart_data = contrib.set_index("Student")[["Entries Added", "Entries Edited"]]
-        fig = go.Figure()
-        fig.add_bar(name="Added",  x=chart_data.index, y=chart_data["Entries Added"],
-                    marker_color="#1a2e4a")
-        fig.add_bar(name="Edited", x=chart_data.index, y=chart_data["Entries Edited"],
-                    marker_color="#c8952a")
-        max_val = int(chart_data.values.sum())
-        fig.update_layout(
-            barmode="stack", plot_bgcolor="white",
-            yaxis=dict(title="Contributions", tickmode="linear",
-                       tick0=0, dtick=1, range=[0, max(max_val, 1) + 0.5]),
-            xaxis_title="Student", legend_title="Type",
-            margin=dict(t=20, b=20),
-        )
-        st.plotly_chart(fig, width='stretch')
+        if len(contrib) <= HTML_CHART_MAX_STUDENTS:
+            st.html(contrib_bars_html(contrib))
+        else:
+            fig = build_contrib_fig(tuple(contrib["Student"].tolist()),
+                                    tuple(contrib["Entries Added"].tolist()),
+                                    tuple(contrib["Entries Edited"].tolist()))
+            st.plotly_chart(fig, width='stretch')
 
 
 
@@ -586,25 +738,34 @@ with tab3:
                                     ["— all concepts —"] + CONCEPTS,
                                     key="hist_concept_select")
     selected_concept = None if hist_concept == "— all concepts —" else hist_concept
+    # Table view ships the whole history as one Arrow payload instead of one expander per revision
+    hist_table       = st.toggle("Compact table view", key="hist_table_view")
 
     hist_df = load_history(active_class, selected_concept)
 
     if hist_df.empty:
         st.info("No history recorded yet for this selection.")
+    elif hist_table:
+        st.dataframe(hist_df[["category", "edited_on", "edited_by", "practice"]],
+            width='stretch', hide_index=True,
+            column_config={
+                "category":  st.column_config.TextColumn("🏷️ Concept"),
+                "edited_on": st.column_config.TextColumn("🕒 Edited on"),
+                "edited_by": st.column_config.TextColumn("✏️ Edited by"),
+                "practice":  st.column_config.TextColumn("Best Practice", width="large"),
+            })
     else:
-        for _, hrow in hist_df.iterrows():
-            colour = CONCEPT_COLOURS.get(hrow["category"], "#4a90d9")
+        for hrow in hist_df.itertuples(index=False):
             with st.expander(
-                f"**{hrow['category']}** · {hrow['edited_on']} · {hrow['edited_by']}",
+                f"**{hrow.category}** · {hrow.edited_on} · {hrow.edited_by}",
                 expanded=False,
             ):
-                st.markdown(
-                    f'<div class="bp-card" style="border-left:5px solid {colour};">'
-                    f'<div class="bp-practice">{hrow["practice"]}</div>'
+                st.html(
+                    f'<div class="bp-card {CONCEPT_CLASSES.get(hrow.category, "")}">'
+                    f'<div class="bp-practice">{hrow.practice_h}</div>'
                     f'<div class="bp-meta">'
-                    f'<span>✏️ <strong>{hrow["edited_by"]}</strong> · {hrow["edited_on"]}</span>'
+                    f'<span>✏️ <strong>{hrow.edited_by_h}</strong> · {hrow.edited_on}</span>'
                     f'</div></div>',
-                    unsafe_allow_html=True,
                 )
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -618,49 +779,30 @@ if cross_class_enabled and tab_compare is not None:
             "Below you can compare each class's best practice for every concept side by side."
         )
 
-        df_f1 = load_data(CLASSES[0])
-        df_f2 = load_data(CLASSES[1])
+        entries_f1 = entries_by_concept(load_data(CLASSES[0]))
+        entries_f2 = entries_by_concept(load_data(CLASSES[1]))
 
         for concept in CONCEPTS:
-            colour = CONCEPT_COLOURS[concept]
             st.markdown(
-                f'<div style="background:{colour};color:white;font-weight:700;'
-                f'font-size:.85rem;letter-spacing:.6px;text-transform:uppercase;'
-                f'padding:.45rem .9rem;border-radius:6px;margin:1.4rem 0 .6rem;">'
-                f'{concept}</div>',
+                f'<div class="concept-bar spaced {CONCEPT_CLASSES[concept]}">{concept}</div>',
                 unsafe_allow_html=True,
             )
             col_f1, col_f2 = st.columns(2)
 
-            for col, cls, df_cls in [
-                (col_f1, CLASSES[0], df_f1),
-                (col_f2, CLASSES[1], df_f2),
+            for col, cls, entries in [
+                (col_f1, CLASSES[0], entries_f1),
+                (col_f2, CLASSES[1], entries_f2),
             ]:
                 with col:
                     st.markdown(f"**{cls}**")
-                    rows = df_cls[df_cls["category"] == concept]
-                    if rows.empty:
+                    row = entries.get(concept)
+                    if row is None:
                         st.markdown(
                             '<p style="color:#6b7a99;font-size:.88rem;">No entry yet.</p>',
                             unsafe_allow_html=True,
                         )
                     else:
-                        row = rows.iloc[0]
-                        edited_line = ""
-                        if str(row.get("last_edited_by", "")).strip() not in ("", "nan"):
-                            edited_line = (
-                                f'<span>✏️ Last edited by <strong>{row["last_edited_by"]}</strong>'
-                                f' on {row["last_edited_on"]}</span>'
-                            )
-                        st.markdown(
-                            f'<div class="bp-card" style="border-left:5px solid {colour};">'
-                            f'<div class="bp-practice">{row["practice"]}</div>'
-                            f'<div class="bp-meta">'
-                            f'<span>➕ Added by <strong>{row["added_by"]}</strong> on {row["added_on"]}</span>'
-                            f'{edited_line}'
-                            f'</div></div>',
-                            unsafe_allow_html=True,
-                        )
+                        st.html(card_html(row, show_count=False))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TAB 4 — ADMIN
@@ -690,6 +832,7 @@ with tab4:
             if st.button("🔒 Disable cross-class comparison", key="btn_disable_cc"):
                 try:
                     supabase.table(SETTINGS_TABLE).upsert({"key": "cross_class_enabled", "value": "false"}).execute()
+                    _fetch_setting.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to save setting: {e}")
@@ -698,6 +841,7 @@ with tab4:
             if st.button("🔓 Enable cross-class comparison", key="btn_enable_cc"):
                 try:
                     supabase.table(SETTINGS_TABLE).upsert({"key": "cross_class_enabled", "value": "true"}).execute()
+                    _fetch_setting.clear()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to save setting: {e}")
@@ -710,19 +854,23 @@ with tab4:
         )
 
         reset_class = st.selectbox("Class to reset", CLASSES, key="admin_class_select")
-        df_admin    = load_data(reset_class)
+        # The active class is already loaded as df — don't rebuild it. Any other class
+        # was prefetched with the header reads, so load_data finds it cached
+        if admin_future is not None:
+            admin_future.result()
+        df_admin    = df if reset_class == active_class else load_data(reset_class)
 
         if df_admin.empty:
             st.info(f"No entries found for {reset_class}.")
         else:
+            admin_entries = entries_by_concept(df_admin)
             for concept in CONCEPTS:
-                colour    = CONCEPT_COLOURS[concept]
-                rows      = df_admin[df_admin["category"] == concept]
-                has_entry = not rows.empty
+                entry     = admin_entries.get(concept)
+                has_entry = entry is not None
 
                 col_label, col_btn = st.columns([3, 1])
                 with col_label:
-                    status = (f"<span style='color:{colour};font-weight:700;'>{concept}</span> — "
+                    status = (f"<span class='concept-label {CONCEPT_CLASSES[concept]}'>{concept}</span> — "
                               f"{'✅ has entry' if has_entry else '⬜ empty'}")
                     st.markdown(status, unsafe_allow_html=True)
                 with col_btn:
@@ -732,7 +880,7 @@ with tab4:
                             dcol1, dcol2 = st.columns(2)
                             with dcol1:
                                 if st.button("Yes, delete", key=f"admin_del_yes_{concept}"):
-                                    delete_row(int(rows.iloc[0]["id"]))
+                                    delete_row(int(entry.id))
                                     st.session_state.confirm_reset = None
                                     st.success(f"✅ '{concept}' cleared for {reset_class}.")
                                     st.rerun()